@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark the product import row mapping on a generated supplier sheet.
+
+Compares the old per-row iterrows() mapping (one Product model per row)
+with the column-wise prepare_import_rows() used by /products/import.
+No database is touched; only the DataFrame -> product rows step is timed.
+
+Usage: python benchmark_import.py [rows] [--xlsx]
+"""
+
+import io
+import sys
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pandas as pd
+from pydantic import ValidationError
+
+from product_management import Product, fix_invalid_url, prepare_import_rows, to_naive
+
+def build_sheet(rows):
+    return pd.DataFrame({
+        "Barcode": [f"885{i:010d}" for i in range(rows)],
+        "Name": [f"Product {i}" for i in range(rows)],
+        "Price": [round(0.5 + (i % 400) * 0.25, 2) for i in range(rows)],
+        "Unit": ["bottle" if i % 2 else "box" for i in range(rows)],
+        "Tags": ["drink,cold" if i % 3 else None for i in range(rows)],
+        "Thumbnail URL": [
+            f"/images/p {i}.jpg" if i % 10 == 0 else f"https://cdn.example.com/p/{i}.jpg" for i in range(rows)
+        ],
+        "Gallery URLs": [f"https://cdn.example.com/g/{i}.jpg" if i % 4 == 0 else None for i in range(rows)],
+        "Quantity": [i % 50 for i in range(rows)],
+        "Stock Visibility": ["show_quantity" if i % 100 else "invalid" for i in range(rows)],
+        "Display Price": [True] * rows,
+        "Featured": [i % 20 == 0 for i in range(rows)],
+        "Today's Deal": [i % 30 == 0 for i in range(rows)],
+        "Telegram": [None] * rows,
+        "Phone": ["012345678"] * rows,
+        "Social Link": [None] * rows,
+        "Meta Name": [None] * rows,
+        "Meta Description": [None] * rows,
+        "Meta Image": [None] * rows,
+        "Published": ["yes"] * rows,
+    })
+
+def legacy_rows(df):
+    """The per-row mapping /products/import used before prepare_import_rows."""
+    rows = []
+    errors = []
+    for idx, row in df.iterrows():
+        try:
+            row = row.where(pd.notnull(row), None)
+            product_dict = {
+                "id": str(uuid4()),
+                "barcode": str(row.get("Barcode") or "").strip(),
+                "name": row.get("Name", ""),
+                "price": float(row.get("Price", 0)),
+                "unit": row.get("Unit", ""),
+                "tags": row.get("Tags", "").split(",") if row.get("Tags") else [],
+                "thumbnail_url": fix_invalid_url(row.get("Thumbnail URL", "")),
+                "gallery_urls": [fix_invalid_url(row.get("Gallery URLs", ""))] if row.get("Gallery URLs") else [],
+                "quantity": int(row.get("Quantity", 0)),
+                "stock_visibility": row.get("Stock Visibility", "show_quantity"),
+                "display_price": bool(row.get("Display Price", True)),
+                "featured": bool(row.get("Featured", False)),
+                "todays_deal": bool(row.get("Today's Deal", False)),
+                "telegram": str(row.get("Telegram", "")).strip(),
+                "phone": str(row.get("Phone", "")).strip(),
+                "social_link": str(row.get("Social Link", "")).strip(),
+                "meta_name": row.get("Meta Name") or f"Buy {row.get('Name')} Online",
+                "meta_description": row.get(
+                    "Meta Description") or f"Order {row.get('Name')} now for just ${row.get('Price')}. Fast delivery.",
+                "meta_image": row.get("Meta Image") or row.get("Thumbnail URL", ""),
+                "published": str(row.get("Published", "true")).strip().lower() in ["true", "1", "yes"],
+                "review_count": 0,
+                "average_rating": 0.0,
+                "created_at": to_naive(datetime.now(timezone.utc)),
+                "updated_at": to_naive(datetime.now(timezone.utc))
+            }
+            rows.append(Product(**product_dict).dict())
+        except (ValidationError, ValueError, TypeError, AttributeError) as e:
+            errors.append(f"Row {idx + 2}: {str(e)}")
+    return rows, errors
+
+def timed(label, func, df):
+    started = time.perf_counter()
+    result = func(df)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {elapsed:8.2f}s  {len(df) / elapsed:>10,.0f} rows/s  "
+          f"accepted={len(result[0]):,} rejected={len(result[-1]):,}")
+    return elapsed
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    rows = int(args[0]) if args else 100_000
+    df = build_sheet(rows)
+    if "--xlsx" in sys.argv:
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        buffer.seek(0)
+        started = time.perf_counter()
+        df = pd.read_excel(buffer)
+        print(f"read_excel   {time.perf_counter() - started:8.2f}s  ({buffer.getbuffer().nbytes / 1e6:.1f} MB)")
+    print(f"Import row mapping benchmark: {rows:,} rows")
+    legacy = timed("iterrows", legacy_rows, df)
+    vectorized = timed("vectorized", prepare_import_rows, df)
+    print(f"Speedup: {legacy / vectorized:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot product queries through the three database paths.
+
+Each query shape (product by id, a product page, a name/tag search) runs
+against DATABASE_URL over a single pooled connection, three ways:
+
+  unprepared   databases.fetch_all with statement_cache_size=0: compiled by
+               SQLAlchemy and parsed/planned by Postgres on every call
+  databases    databases.fetch_all with asyncpg's statement cache: compiled
+               on every call, prepared once per connection
+  precompiled  StatementCache.fetch_all, as the API uses it: compiled once
+               per query shape and prepared once per connection
+
+Usage: python benchmark_queries.py [iterations]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import databases
+
+from product_management import (
+    DATABASE_URL, StatementCache, build_product_list_query, build_product_search_query, data_table
+)
+
+SEARCH_TERMS = ["coffee", "milk", "tea", "water", "rice", "a"]
+
+def query_cases(product_ids):
+    return {
+        "get_by_id": lambda i: data_table.select().where(data_table.c.id == product_ids[i % len(product_ids)]),
+        "list_page": lambda i: build_product_list_query(published_only=True, sort="newest").offset((i % 10) * 20).limit(20),
+        "search": lambda i: build_product_search_query(SEARCH_TERMS[i % len(SEARCH_TERMS)]),
+    }
+
+async def timed_calls(run, build, iterations):
+    for i in range(min(20, iterations)):
+        await run(build(i))
+    samples = []
+    for i in range(iterations):
+        query = build(i)
+        started = time.perf_counter()
+        await run(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    unprepared = databases.Database(DATABASE_URL, min_size=1, max_size=1, statement_cache_size=0)
+    prepared = databases.Database(DATABASE_URL, min_size=1, max_size=1)
+    statements = StatementCache()
+    await unprepared.connect()
+    await prepared.connect()
+    try:
+        rows = await prepared.fetch_all(data_table.select().with_only_columns(data_table.c.id).limit(200))
+        if not rows:
+            sys.exit("No products to query; import some first")
+        paths = {
+            "unprepared": unprepared.fetch_all,
+            "databases": prepared.fetch_all,
+            "precompiled": lambda query: statements.fetch_all(prepared, query),
+        }
+        print(f"Query latency over {iterations:,} calls per path (ms)")
+        print(f"{'query':<11} {'path':<12} {'mean':>8} {'p50':>8} {'p95':>8}  speedup")
+        for name, build in query_cases([row["id"] for row in rows]).items():
+            baseline = None
+            for path, run in paths.items():
+                mean, p50, p95 = await timed_calls(run, build, iterations)
+                baseline = baseline or mean
+                print(f"{name:<11} {path:<12} {mean:8.3f} {p50:8.3f} {p95:8.3f}  {baseline / mean:4.1f}x")
+    finally:
+        await unprepared.disconnect()
+        await prepared.disconnect()
+
+if __name__ == "__main__":
+    asyncio.run(main())
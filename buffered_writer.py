@@ -0,0 +1,170 @@
+import asyncio
+import time
+from collections import deque
+
+
+class WriterOverloaded(Exception):
+    """Raised when the buffer stays full for longer than the enqueue timeout."""
+
+
+class BufferedWriter:
+    """Groups rows from many requests into batched writes.
+
+    ``submit(rows)`` appends to an in-memory buffer and returns at once;
+    a background task calls ``write(batch)`` when ``max_batch`` rows are
+    waiting or ``flush_interval`` seconds have passed. Callers that need
+    the rows committed pass ``durable=True`` and wait for their batch.
+    Buffered rows are lost if the process dies before the next flush.
+
+    The buffer holds at most ``max_pending`` rows. A full buffer makes
+    ``submit`` wait up to ``enqueue_timeout`` seconds for a flush, then
+    raise ``WriterOverloaded``. A failed write is retried
+    ``max_retries`` times before its rows are dropped and counted.
+    """
+
+    def __init__(self, name, write, max_batch=1000, flush_interval=0.25, max_pending=50000,
+                 enqueue_timeout=2.0, max_retries=3):
+        self.name = name
+        self.write = write
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self._pending = deque()
+        # Rows are numbered as they are enqueued; durable callers wait for their range
+        self._enqueued = 0
+        self._processed = 0
+        self._waiters = deque()
+        self._task = None
+        self._wakeup = None
+        self._space = None
+        self._closing = False
+        self._started_at = None
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.last_flush_rows = 0
+        self.last_flush_ms = 0.0
+
+    async def submit(self, rows, durable=False):
+        if not rows:
+            return
+        if self._task is None:
+            # Not running (disabled or shut down): write straight through
+            await self.write(rows)
+            self.received += len(rows)
+            self.written += len(rows)
+            return
+        if len(rows) > self.max_pending:
+            raise ValueError(f"{len(rows)} rows exceed the {self.name} buffer of {self.max_pending}")
+        if len(self._pending) + len(rows) > self.max_pending:
+            # Capacity is re-checked under the condition's lock, which flushes take to notify,
+            # so a flush finishing between the check and the wait cannot be missed
+            deadline = time.monotonic() + self.enqueue_timeout
+            async with self._space:
+                while len(self._pending) + len(rows) > self.max_pending:
+                    try:
+                        await asyncio.wait_for(self._space.wait(), timeout=max(deadline - time.monotonic(), 0))
+                    except asyncio.TimeoutError:
+                        self.rejected += len(rows)
+                        raise WriterOverloaded(f"{self.name} buffer is full ({len(self._pending)} rows pending)")
+        first = self._enqueued + 1
+        self._pending.extend(rows)
+        self._enqueued += len(rows)
+        self.received += len(rows)
+        future = None
+        if durable:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append((first, self._enqueued, future))
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        if future is not None:
+            await future
+
+    async def _flush_batch(self):
+        batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+        first, last = self._processed + 1, self._processed + len(batch)
+        started = time.perf_counter()
+        error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.write(batch)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                self.failed_flushes += 1
+                print(f"ERROR: {self.name} flush of {len(batch)} rows failed (attempt {attempt + 1}) - {str(e)}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(0.5 * 2 ** attempt, 5))
+        self._processed = last
+        async with self._space:
+            self._space.notify_all()
+        if error is None:
+            self.flushes += 1
+            self.written += len(batch)
+            self.last_flush_rows = len(batch)
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        else:
+            self.dropped += len(batch)
+            for start, end, future in self._waiters:
+                if start <= last and end >= first and not future.done():
+                    future.set_exception(error)
+        while self._waiters and self._waiters[0][1] <= self._processed:
+            _, _, future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    async def _run(self):
+        while not (self._closing and not self._pending):
+            if len(self._pending) < self.max_batch and not self._closing:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            while self._pending:
+                await self._flush_batch()
+                if len(self._pending) < self.max_batch and not self._closing:
+                    break
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._space = asyncio.Condition()
+            self._closing = False
+            self._started_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush whatever is buffered, then stop the background task."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await task
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0
+        return {
+            "name": self.name,
+            "running": self._task is not None,
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "max_batch": self.max_batch,
+            "flush_interval_seconds": self.flush_interval,
+            "received": self.received,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "last_flush_rows": self.last_flush_rows,
+            "last_flush_ms": self.last_flush_ms,
+            "rows_per_second": round(self.written / elapsed, 1) if elapsed else 0.0,
+        }
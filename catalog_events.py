@@ -0,0 +1,141 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import asyncpg
+import sqlalchemy
+
+CHANNEL = "catalog_changes"
+# NOTIFY payloads are capped at 8000 bytes, so large id lists are split
+MAX_IDS_PER_NOTIFY = 100
+
+
+class CatalogEvents:
+    """Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+    Writers call ``publish(entity, ids)``: local caches are evicted right away
+    and a ``NOTIFY catalog_changes`` tells every other worker to do the same.
+    Each worker keeps one dedicated asyncpg connection LISTENing on the
+    channel. Notifications sent while that connection is down are lost, so
+    every (re)connect flushes all registered caches.
+    """
+
+    def __init__(self, database, dsn, keepalive_interval=30.0, max_reconnect_delay=30.0):
+        self.database = database
+        self.dsn = dsn
+        self.keepalive_interval = keepalive_interval
+        self.max_reconnect_delay = max_reconnect_delay
+        self.source = uuid4().hex
+        self._invalidators = {}
+        self._flushers = {}
+        self._task = None
+        self._connection = None
+        self._lost = None
+        self.received = 0
+        self.published = 0
+        self.reconnects = 0
+
+    def register(self, entity, invalidate, flush):
+        self._invalidators.setdefault(entity, []).append(invalidate)
+        self._flushers.setdefault(entity, []).append(flush)
+
+    def dispatch(self, entity, ids=None):
+        if ids is None:
+            for flush in self._flushers.get(entity, []):
+                flush()
+        else:
+            for invalidate in self._invalidators.get(entity, []):
+                invalidate(*ids)
+
+    def flush_all(self):
+        for flushers in self._flushers.values():
+            for flush in flushers:
+                flush()
+
+    async def publish(self, entity, ids=None):
+        """Evict locally, then notify the other workers. ``ids=None`` flushes the entity type."""
+        ids = None if ids is None else [str(i) for i in ids]
+        self.dispatch(entity, ids)
+        if ids is None:
+            chunks = [None]
+        else:
+            chunks = [ids[i:i + MAX_IDS_PER_NOTIFY] for i in range(0, len(ids), MAX_IDS_PER_NOTIFY)]
+        try:
+            for chunk in chunks:
+                payload = json.dumps({"entity": entity, "ids": chunk, "source": self.source})
+                await self.database.execute(
+                    sqlalchemy.select(sqlalchemy.func.pg_notify(CHANNEL, payload))
+                )
+                self.published += 1
+        except Exception as e:
+            print(f"ERROR: Failed to publish {entity} change - {str(e)}")
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("source") == self.source:
+            return
+        self.received += 1
+        self.dispatch(message.get("entity"), message.get("ids"))
+
+    def _on_termination(self, connection):
+        if self._lost is not None:
+            self._lost.set()
+
+    async def _listen_forever(self):
+        delay = 1.0
+        while True:
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                self._lost = asyncio.Event()
+                self._connection.add_termination_listener(self._on_termination)
+                await self._connection.add_listener(CHANNEL, self._on_notification)
+                # Anything published while we were not listening was missed
+                self.flush_all()
+                delay = 1.0
+                while not self._lost.is_set():
+                    try:
+                        await asyncio.wait_for(self._lost.wait(), timeout=self.keepalive_interval)
+                    except asyncio.TimeoutError:
+                        await self._connection.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WARNING: catalog_changes listener lost - {str(e)}")
+            finally:
+                await self._close_connection()
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _close_connection(self):
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=5)
+            except Exception:
+                connection.terminate()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_connection()
+
+    def stats(self):
+        return {
+            "listening": self._connection is not None and not self._connection.is_closed(),
+            "published": self.published,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
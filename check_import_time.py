@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Check that a cold import of the app stays inside its startup budget.
+
+Imports product_management in a fresh interpreter under ``python -X
+importtime`` a few times and takes the fastest run, so one slow disk read
+does not fail the check. Fails when that import takes longer than the budget
+or when any module that is meant to load lazily (see lazy_imports.py) is
+imported at boot.
+
+Usage: python check_import_time.py [--budget-ms MS] [--runs N] [--top N]
+Environment: IMPORT_BUDGET_MS (default 1000)
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Heavy dependencies only some endpoints use; none of them may load at import time
+LAZY_MODULES = ["pandas", "numpy", "aiohttp", "PIL", "pytesseract", "imagehash", "openpyxl", "pyarrow"]
+
+def import_profile(module):
+    """Run one cold import and return [(cumulative_us, self_us, depth, name)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(f"Importing {module} failed")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import budget for product_management")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 1000)))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    runs, budget_ms = args.runs, args.budget_ms
+
+    profiles = [import_profile("product_management") for _ in range(runs)]
+    totals = [next(entry[0] for entry in profile if entry[3] == "product_management") for profile in profiles]
+    best = min(range(runs), key=lambda i: totals[i])
+    profile = profiles[best]
+    total_ms = totals[best] / 1000
+
+    print(f"Cold import of product_management: {total_ms:.0f} ms (best of {runs}, budget {budget_ms:.0f} ms)")
+    print("Slowest top-level imports:")
+    top_level = sorted((entry for entry in profile if entry[2] == 1), reverse=True)[:args.top]
+    for cumulative_us, _, _, name in top_level:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    loaded = sorted({entry[3] for entry in profile if entry[3].split(".")[0] in LAZY_MODULES})
+    if loaded:
+        roots = sorted({name.split(".")[0] for name in loaded})
+        failures.append(f"lazily loaded modules imported at boot: {', '.join(roots)}")
+    if total_ms > budget_ms:
+        failures.append(f"import took {total_ms:.0f} ms, over the {budget_ms:.0f} ms budget")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Check read-replica routing against DATABASE_URL and DATABASE_READ_URLS.
+
+Drives the app in-process and verifies that read endpoints are answered by
+a replica, that a write pins the client to the primary for
+READ_YOUR_WRITES_SECONDS (and the pinned read sees the write), and that
+reads go back to the replicas once the window has passed. The product it
+creates is deleted at the end. Stop a replica while this runs, or before
+it, to see reads fall back to the primary.
+
+Usage: DATABASE_READ_URLS=postgresql://...replica python check_read_replicas.py
+"""
+
+import sys
+import time
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+import product_management as pm
+
+def source(response):
+    return response.headers.get("x-read-source")
+
+def main():
+    if not pm.DATABASE_READ_URLS:
+        sys.exit("Set DATABASE_READ_URLS to one or more replica URLs")
+    failures = []
+
+    def expect(label, ok, detail=""):
+        print(f"{'✅' if ok else '❌'} {label}{f' ({detail})' if detail else ''}")
+        if not ok:
+            failures.append(label)
+
+    with TestClient(pm.app) as client:
+        replicas = client.get("/db/stats").json()["read_replicas"]["replicas"]
+        for replica in replicas:
+            print(f"{replica['name']}: healthy={replica['healthy']} standby={replica['standby']} "
+                  f"lag={replica['lag_seconds']} {replica['last_error'] or ''}")
+        healthy = any(replica["healthy"] for replica in replicas)
+
+        response = client.get("/products", params={"limit": 1})
+        expect("reads go to a replica" if healthy else "reads fall back to the primary",
+               (source(response) or "").startswith("replica") == healthy, source(response))
+
+        response = client.get("/products/export", params={"format": "ndjson"})
+        expect("streamed exports say which server answered",
+               (source(response) or "").startswith("replica") == healthy, source(response))
+
+        product = {
+            "barcode": f"replica-check-{uuid4().hex[:8]}", "name": "Replica check", "price": 1.0, "unit": "pcs",
+            "tags": [], "thumbnail_url": "https://example.com/replica-check.png", "gallery_urls": [], "quantity": 0,
+            "stock_visibility": "hide",
+        }
+        response = client.post("/products", json=product)
+        product_id = response.json()["id"]
+        expect("a write returns a primary pin", "x-db-pin" in response.headers, response.headers.get("x-db-pin"))
+
+        response = client.get(f"/products/{product_id}/reviews/summary")
+        expect("the writer's next read uses the primary and sees the write",
+               source(response) == "primary" and response.status_code == 200,
+               f"{source(response)}, {response.status_code}")
+
+        # Another client: same app and event loop, but without the writer's pin cookie
+        cookies, client.cookies = client.cookies, {}
+        response = client.get("/products", params={"limit": 1})
+        client.cookies = cookies
+        expect("other clients keep reading from replicas",
+               (source(response) or "").startswith("replica") == healthy, source(response))
+
+        time.sleep(pm.READ_YOUR_WRITES_SECONDS + 0.5)
+        response = client.get(f"/products/{product_id}/reviews/summary")
+        expect("after the window the writer reads from replicas again",
+               (source(response) or "").startswith("replica") == healthy, f"{source(response)}, {response.status_code}")
+
+        client.delete(f"/products/{product_id}")
+        print(client.get("/db/stats").json()["read_replicas"])
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
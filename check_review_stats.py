@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Check product creation and incremental review stats against DATABASE_URL.
+
+Creates a product through POST /products, reads it back by the returned id,
+adds two reviews and deletes one, checking review_count, average_rating and
+rating_histogram after each step, then runs the reconciliation job to confirm
+nothing drifted. The product (and with it its reviews) is deleted at the end.
+
+Usage: python check_review_stats.py
+"""
+
+import sys
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+import product_management as pm
+
+def main():
+    failures = []
+
+    def expect(label, ok, detail=""):
+        print(f"{'✅' if ok else '❌'} {label}{f' ({detail})' if detail else ''}")
+        if not ok:
+            failures.append(label)
+
+    def expect_summary(label, count, average, histogram):
+        summary = client.get(f"/products/{product_id}/reviews/summary").json()
+        expect(
+            label,
+            summary["review_count"] == count and abs(summary["average_rating"] - average) < 1e-9
+            and summary["rating_histogram"] == histogram,
+            f"{summary['review_count']} reviews, average {summary['average_rating']}, {summary['rating_histogram']}"
+        )
+
+    with TestClient(pm.app) as client:
+        product = {
+            "barcode": f"review-check-{uuid4().hex[:8]}", "name": "Review check", "price": 1.0, "unit": "pcs",
+            "tags": [], "thumbnail_url": "https://example.com/review-check.png", "gallery_urls": [], "quantity": 0,
+            "stock_visibility": "hide",
+        }
+        response = client.post("/products", json=product)
+        expect("POST /products creates the product", response.status_code == 200,
+               f"{response.status_code} {response.text[:200]}")
+        if response.status_code != 200:
+            sys.exit(1)
+        product_id = response.json()["id"]
+        response = client.get(f"/products/{product_id}")
+        expect("the returned id is the stored one", response.status_code == 200, str(response.status_code))
+        expect_summary("a new product starts with empty stats", 0, 0.0, [0, 0, 0, 0, 0])
+
+        try:
+            first = client.post(f"/products/{product_id}/reviews",
+                                json={"product_id": product_id, "user_id": "review-check", "rating": 5})
+            expect("POST a review", first.status_code == 200, f"{first.status_code} {first.text[:200]}")
+            client.post(f"/products/{product_id}/reviews",
+                        json={"product_id": product_id, "user_id": "review-check", "rating": 2})
+            expect_summary("stats follow added reviews", 2, 3.5, [0, 1, 0, 0, 1])
+
+            client.delete(f"/reviews/{first.json()['id']}")
+            expect_summary("stats follow a deleted review", 1, 2.0, [0, 1, 0, 0, 0])
+
+            fixed = client.post("/reviews/stats/reconcile").json().get("product_ids", [])
+            expect("reconciliation finds no drift", product_id not in fixed)
+        finally:
+            client.delete(f"/products/{product_id}")
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
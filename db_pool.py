@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+
+import asyncpg
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+# Acquisition totals for the request being served, when AcquireTimingMiddleware is installed
+request_db_stats = contextvars.ContextVar("request_db_stats", default=None)
+
+# Upper bounds (ms) of the acquisition wait histogram
+WAIT_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000]
+
+
+class DatabaseTimeout(Exception):
+    """A pool checkout or a query ran past its timeout; the request may be retried."""
+
+
+class TimeoutConnection(asyncpg.Connection):
+    """asyncpg connection whose command timeouts raise ``DatabaseTimeout``.
+
+    Passed to the pool as ``connection_class`` so a query that runs past
+    ``command_timeout`` can be told apart from any other
+    ``asyncio.TimeoutError`` in the app. Cursors are not covered: a timeout
+    while iterating one surfaces mid-stream, where no error response can be
+    sent anyway.
+    """
+
+    async def _translate(self, call):
+        try:
+            return await call
+        except asyncio.TimeoutError as e:
+            raise DatabaseTimeout("Query timed out") from e
+
+    async def execute(self, *args, **kwargs):
+        return await self._translate(super().execute(*args, **kwargs))
+
+    async def executemany(self, *args, **kwargs):
+        return await self._translate(super().executemany(*args, **kwargs))
+
+    async def fetch(self, *args, **kwargs):
+        return await self._translate(super().fetch(*args, **kwargs))
+
+    async def fetchrow(self, *args, **kwargs):
+        return await self._translate(super().fetchrow(*args, **kwargs))
+
+    async def fetchval(self, *args, **kwargs):
+        return await self._translate(super().fetchval(*args, **kwargs))
+
+    async def copy_records_to_table(self, *args, **kwargs):
+        return await self._translate(super().copy_records_to_table(*args, **kwargs))
+
+
+class InstrumentedPool:
+    """Wraps the asyncpg pool behind ``databases`` and times every checkout.
+
+    ``databases`` only calls ``acquire``/``release`` on its pool, so the
+    wrapper is installed in place of the backend pool right after
+    ``Database.connect()``; everything else is passed through. Checkouts
+    that wait longer than ``acquire_timeout`` raise ``DatabaseTimeout``
+    instead of queueing forever behind a saturated pool.
+    """
+
+    def __init__(self, pool, acquire_timeout=None):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    @classmethod
+    def install(cls, database, acquire_timeout=None):
+        backend = database._backend
+        if not isinstance(backend._pool, cls):
+            backend._pool = cls(backend._pool, acquire_timeout)
+        return backend._pool
+
+    async def acquire(self, *, timeout=None):
+        started = time.perf_counter()
+        try:
+            connection = await self._pool.acquire(timeout=timeout or self.acquire_timeout)
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            raise DatabaseTimeout("No free database connection") from e
+        waited_ms = (time.perf_counter() - started) * 1000
+        self.acquisitions += 1
+        self.wait_ms_total += waited_ms
+        self.wait_ms_max = max(self.wait_ms_max, waited_ms)
+        self.wait_buckets[next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if waited_ms <= bound), -1)] += 1
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats["acquisitions"] += 1
+            stats["wait_ms"] += waited_ms
+        return connection
+
+    async def release(self, connection, *, timeout=None):
+        return await self._pool.release(connection, timeout=timeout)
+
+    def __getattr__(self, attr):
+        return getattr(self._pool, attr)
+
+    def stats(self):
+        pool = self._pool
+        return {
+            "size": pool.get_size(),
+            "idle": pool.get_idle_size(),
+            "min_size": pool.get_min_size(),
+            "max_size": pool.get_max_size(),
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_ms_total / self.acquisitions, 3) if self.acquisitions else 0.0,
+            "wait_ms_max": round(self.wait_ms_max, 3),
+            "wait_ms_histogram": {
+                **{f"<={bound}": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)},
+                f">{WAIT_BUCKETS_MS[-1]}": self.wait_buckets[-1],
+            },
+        }
+
+
+class AcquireTimingMiddleware:
+    """ASGI middleware that reports a request's pool waits in ``Server-Timing``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = {"acquisitions": 0, "wait_ms": 0.0}
+        token = request_db_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and stats["acquisitions"]:
+                timing = f'db-acquire;dur={stats["wait_ms"]:.2f};desc="{stats["acquisitions"]} checkouts"'
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_db_stats.reset(token)
+
+
+class StatementCache:
+    """asyncpg SQL for SQLAlchemy statements, compiled once per statement shape.
+
+    ``databases`` compiles every query on every call. Here the compiled SQL
+    is cached under SQLAlchemy's statement cache key, which ignores literal
+    values, so two product pages with different filters values but the same
+    filters share one entry and only the parameters are extracted per call.
+    Identical SQL text lets asyncpg reuse its per-connection prepared
+    statement (``statement_cache_size``) instead of parsing and planning
+    again. Rows come back as asyncpg records, so column types must be ones
+    asyncpg maps natively (no SQLAlchemy result processing is applied).
+    """
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self.dialect = asyncpg_dialect()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, query):
+        cache_key = query._generate_cache_key()
+        if cache_key is None:
+            compiled = query.compile(dialect=self.dialect)
+            params = compiled.construct_params()
+        else:
+            compiled = self._entries.get(cache_key.key)
+            if compiled is None:
+                self.misses += 1
+                compiled = query.compile(dialect=self.dialect, cache_key=cache_key)
+                self._entries[cache_key.key] = compiled
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+                self._entries.move_to_end(cache_key.key)
+            params = compiled.construct_params(extracted_parameters=cache_key.bindparams)
+        return compiled.string, [params[name] for name in compiled.positiontup]
+
+    async def fetch_all(self, database, query):
+        sql, args = self.compile(query)
+        async with database.connection() as connection:
+            return await connection.raw_connection.fetch(sql, *args)
+
+    async def fetch_one(self, database, query):
+        sql, args = self.compile(query)
+        async with database.connection() as connection:
+            return await connection.raw_connection.fetchrow(sql, *args)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
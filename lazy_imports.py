@@ -0,0 +1,47 @@
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a heavy module that is imported on first attribute access.
+
+    ``pd = LazyModule("pandas")`` can be used exactly like ``import pandas
+    as pd``, but the import cost is paid by the first request that needs
+    it instead of by every worker at boot. Attributes are copied onto the
+    proxy once looked up, so hot loops pay a plain attribute read.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def available(self):
+        """Whether the module can be imported; for optional dependencies."""
+        try:
+            self.load()
+        except ImportError:
+            return False
+        return True
+
+    def __getattr__(self, attr):
+        if attr in ("_name", "_module"):
+            raise AttributeError(attr)
+        value = getattr(self.load(), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+# Only the product import pipeline and image search need these
+pandas = LazyModule("pandas")
+aiohttp = LazyModule("aiohttp")
+pytesseract = LazyModule("pytesseract")
+# Optional: only Parquet exports need it
+pyarrow = LazyModule("pyarrow")
@@ -0,0 +1,105 @@
+import time
+
+import sqlalchemy
+
+VERSION_TABLE = "schema_version"
+
+
+class MigrationSkipped(Exception):
+    """Raised by a migration step that cannot run on this database (a missing
+    extension, data that must be cleaned up by hand). The failing statement
+    must already be rolled back to a savepoint; the rest of the step commits."""
+
+
+class Migration:
+    """One numbered schema change.
+
+    ``apply(connection)`` runs inside its own transaction on a synchronous
+    SQLAlchemy connection, and the version is recorded in the same
+    transaction. Each step runs fixed SQL, never the live table models, so
+    a shipped migration does the same thing however the models change later.
+    Any error stops the run at that version, so later steps never run ahead
+    of an earlier one. A step that raises ``MigrationSkipped`` is recorded
+    with the reason in ``skipped`` and the run continues; delete its
+    version row to retry it on the next boot. Migrations must be safe to
+    run against a database that already has some of their changes, because
+    databases created before versioning start from version 0.
+    """
+
+    def __init__(self, version, name, apply):
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+
+async def applied_versions(database):
+    """Versions applied or skipped, read over the async pool; empty if versioning is new."""
+    try:
+        versions = await database.fetch_val(f"SELECT array_agg(version) FROM {VERSION_TABLE}")
+    except Exception as e:
+        # A fresh database has no version table yet
+        if "does not exist" not in str(e):
+            raise
+        return set()
+    return set(versions or [])
+
+
+async def migrate(engine, migrations, lock_id):
+    """Apply pending migrations in version order while holding an advisory lock.
+
+    ``engine`` is a SQLAlchemy ``AsyncEngine``; migrations themselves get the
+    synchronous connection API through ``run_sync``. Workers booting
+    together wait on the lock; whoever gets it second finds the work done.
+    Returns the names of the migrations applied.
+    """
+    async with engine.connect() as connection:
+        return await connection.run_sync(_migrate, migrations, lock_id)
+
+
+def _migrate(connection, migrations, lock_id):
+    applied = []
+    connection.execute(sqlalchemy.text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": lock_id})
+    connection.commit()
+    try:
+        connection.execute(sqlalchemy.text(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'), duration_ms FLOAT, skipped VARCHAR)"
+        ))
+        connection.execute(sqlalchemy.text(f"ALTER TABLE {VERSION_TABLE} ADD COLUMN IF NOT EXISTS skipped VARCHAR"))
+        done = set(connection.execute(sqlalchemy.text(f"SELECT version FROM {VERSION_TABLE}")).scalars())
+        connection.commit()
+        for migration in sorted(migrations, key=lambda m: m.version):
+            if migration.version in done:
+                continue
+            started = time.perf_counter()
+            skipped = None
+            with connection.begin():
+                try:
+                    migration.apply(connection)
+                except MigrationSkipped as e:
+                    skipped = str(e)
+                connection.execute(
+                    sqlalchemy.text(
+                        f"INSERT INTO {VERSION_TABLE} (version, name, duration_ms, skipped) "
+                        "VALUES (:version, :name, :duration_ms, :skipped)"
+                    ),
+                    {
+                        "version": migration.version,
+                        "name": migration.name,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                        "skipped": skipped,
+                    },
+                )
+            if skipped is not None:
+                print(
+                    f"WARNING: Migration {migration.version} ({migration.name}) skipped "
+                    f"(delete version {migration.version} from {VERSION_TABLE} to retry it) - {skipped}"
+                )
+                continue
+            print(f"Applied migration {migration.version} ({migration.name})")
+            applied.append(migration.name)
+    finally:
+        connection.execute(sqlalchemy.text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": lock_id})
+        connection.commit()
+    return applied
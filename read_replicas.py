@@ -0,0 +1,280 @@
+import asyncio
+import contextvars
+import itertools
+import time
+from http.cookies import SimpleCookie
+
+import asyncpg
+import databases
+
+from db_pool import InstrumentedPool
+
+PIN_COOKIE = "db_pin"
+PIN_HEADER = "x-db-pin"
+SOURCE_HEADER = "x-read-source"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Per-request routing state set by ReadRoutingMiddleware; None outside requests
+request_route = contextvars.ContextVar("request_route", default=None)
+
+# Errors that mean the replica itself is unreachable, as opposed to a bad query or client-side
+# misuse (asyncpg's InterfaceError). Query and pool timeouts arrive as DatabaseTimeout, which is
+# not among them: a slow query would be just as slow on the primary, so it fails the request.
+REPLICA_ERRORS = (ConnectionError, OSError, asyncio.TimeoutError, asyncpg.PostgresConnectionError,
+                  asyncpg.CannotConnectNowError)
+# A standby cancels queries that conflict with WAL it must replay (SQLSTATE 40001, or 40P01
+# for lock conflicts); the replica is healthy and the read can simply be rerun on the primary
+RECOVERY_CONFLICT_ERRORS = (asyncpg.TransactionRollbackError,)
+
+LAG_QUERY = (
+    "SELECT pg_is_in_recovery() AS standby, CASE "
+    "WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END AS lag_seconds"
+)
+
+
+class Replica:
+    def __init__(self, name, url, options):
+        self.name = name
+        self.url = url
+        self.database = databases.Database(url, **options)
+        self.healthy = False
+        self.standby = None
+        self.lag_seconds = None
+        self.last_error = None
+        self.checked_at = None
+        self.reads = 0
+        self.failovers = 0
+        self.conflicts = 0
+
+    def mark_down(self, error):
+        self.healthy = False
+        self.last_error = f"{type(error).__name__}: {error}"
+
+
+class ReplicaRouter:
+    """Sends read-only queries to healthy read replicas, everything else to the primary.
+
+    Read endpoints call ``fetch_all``/``fetch_one``/``iterate`` here instead
+    of on the primary ``database``. Inside a request handled by
+    ``ReadRoutingMiddleware`` that is not pinned to the primary, one replica
+    is picked round-robin for the whole request; outside requests (background
+    jobs) and while pinned, the primary answers. A background task checks
+    every replica each ``check_interval`` seconds and takes it out of
+    rotation while it is unreachable or more than ``max_lag`` seconds
+    behind. A read that fails because the replica went away is retried on
+    the primary and the replica is marked down until the next good check; a
+    read cancelled by a recovery conflict is retried on the primary too, but
+    the replica stays in rotation. Timeouts are not retried.
+    """
+
+    def __init__(self, primary, replica_urls, statements=None, check_interval=5.0, max_lag=5.0,
+                 check_timeout=2.0, acquire_timeout=None, **options):
+        self.primary = primary
+        self.statements = statements
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.check_timeout = check_timeout
+        self.acquire_timeout = acquire_timeout
+        self.replicas = [Replica(f"replica-{i + 1}", url, options) for i, url in enumerate(replica_urls)]
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._task = None
+        self.primary_reads = 0
+
+    @property
+    def enabled(self):
+        return bool(self.replicas)
+
+    def pick(self):
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    def route(self):
+        """The replica serving the current request, or None for the primary."""
+        state = request_route.get()
+        if state is None:
+            return None
+        if state["pinned"] or not self.replicas:
+            state["source"] = "primary"
+            return None
+        if "replica" not in state:
+            state["replica"] = self.pick()
+        replica = state["replica"]
+        if replica is not None and not replica.healthy:
+            state["replica"] = replica = None
+        state["source"] = replica.name if replica is not None else "primary"
+        return replica
+
+    async def read(self, call):
+        """Run ``call(database)`` on the request's replica, falling back to the primary."""
+        replica = self.route()
+        if replica is not None:
+            try:
+                result = await call(replica.database)
+                replica.reads += 1
+                return result
+            except REPLICA_ERRORS as e:
+                print(f"WARNING: Read replica {replica.name} failed, using the primary - {str(e)}")
+                replica.mark_down(e)
+                replica.failovers += 1
+                request_route.get()["source"] = "primary"
+            except RECOVERY_CONFLICT_ERRORS as e:
+                print(f"WARNING: Read on replica {replica.name} cancelled by recovery, using the primary - {str(e)}")
+                replica.conflicts += 1
+                request_route.get()["source"] = "primary"
+        self.primary_reads += 1
+        return await call(self.primary)
+
+    async def fetch_all(self, query):
+        return await self.read(lambda database: database.fetch_all(query))
+
+    async def fetch_one(self, query):
+        return await self.read(lambda database: database.fetch_one(query))
+
+    async def fetch_all_prepared(self, query):
+        return await self.read(lambda database: self.statements.fetch_all(database, query))
+
+    async def iterate(self, query):
+        # A cursor cannot move to another server midway, so only the choice of server falls back.
+        # Streaming responses start before the body is read: call route() first for X-Read-Source.
+        replica = self.route()
+        database = replica.database if replica is not None else self.primary
+        async for row in database.iterate(query):
+            yield row
+
+    async def check(self, replica):
+        try:
+            if not replica.database.is_connected:
+                await asyncio.wait_for(replica.database.connect(), timeout=self.check_timeout)
+                InstrumentedPool.install(replica.database, acquire_timeout=self.acquire_timeout)
+            row = await asyncio.wait_for(replica.database.fetch_one(LAG_QUERY), timeout=self.check_timeout)
+        except Exception as e:
+            replica.mark_down(e)
+        else:
+            replica.standby = row["standby"]
+            replica.lag_seconds = float(row["lag_seconds"]) if row["lag_seconds"] is not None else None
+            replica.healthy = replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag
+            replica.last_error = None if replica.healthy else f"{replica.lag_seconds}s behind"
+        replica.checked_at = time.time()
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def _check_forever(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.check_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"ERROR: Read replica health check - {str(e)}")
+
+    async def start(self):
+        if self.replicas and self._task is None:
+            # Unreachable replicas do not block startup; they join once a check succeeds
+            await self.check_all()
+            self._task = asyncio.create_task(self._check_forever())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for replica in self.replicas:
+            if replica.database.is_connected:
+                await replica.database.disconnect()
+            replica.healthy = False
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "primary_reads": self.primary_reads,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "standby": replica.standby,
+                    "lag_seconds": replica.lag_seconds,
+                    "reads": replica.reads,
+                    "failovers": replica.failovers,
+                    "conflicts": replica.conflicts,
+                    "last_error": replica.last_error,
+                    "checked_at": replica.checked_at,
+                    "pool": replica.database._backend._pool.stats()
+                    if isinstance(replica.database._backend._pool, InstrumentedPool) else None,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+
+class ReadRoutingMiddleware:
+    """Pins a client to the primary for ``window`` seconds after it writes.
+
+    Any successful request with an unsafe method (other than the read-only
+    ``read_only_paths``) returns a pin deadline, both as the ``db_pin``
+    cookie for browsers and the ``X-DB-Pin`` header for API clients to send
+    back. While a request carries a live pin its reads go to the primary,
+    so clients see their own writes despite replica lag. The deadline is
+    carried by the client, so it holds across workers. Responses say which
+    server answered their reads in ``X-Read-Source``.
+    """
+
+    def __init__(self, app, router, window=5.0, read_only_paths=()):
+        self.app = app
+        self.router = router
+        self.window = window
+        self.read_only_paths = set(read_only_paths)
+
+    def pinned_until(self, scope):
+        until = 0.0
+        for name, value in scope.get("headers", []):
+            if name == PIN_HEADER.encode():
+                until = max(until, _parse_deadline(value.decode("latin-1")))
+            elif name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(PIN_COOKIE)
+                if morsel is not None:
+                    until = max(until, _parse_deadline(morsel.value))
+        return until
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.router.enabled:
+            return await self.app(scope, receive, send)
+        now = time.time()
+        state = {"pinned": self.pinned_until(scope) > now, "source": None}
+        token = request_route.set(state)
+        writes = scope["method"] not in SAFE_METHODS and scope["path"] not in self.read_only_paths
+
+        async def send_with_route(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if state["source"]:
+                    headers.append((SOURCE_HEADER.encode(), state["source"].encode()))
+                if writes and message["status"] < 400:
+                    until = f"{time.time() + self.window:.3f}"
+                    headers.append((PIN_HEADER.encode(), until.encode()))
+                    headers.append((
+                        b"set-cookie",
+                        f"{PIN_COOKIE}={until}; Max-Age={int(self.window) + 1}; Path=/; SameSite=Lax".encode(),
+                    ))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_route)
+        finally:
+            request_route.reset(token)
+
+
+def _parse_deadline(value):
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
@@ -0,0 +1,99 @@
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _unit_vector(lat, lon):
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+def _chord_for_km(km):
+    # Straight-line distance through the sphere between two points km apart on the surface
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class SpatialIndex:
+    """Static k-d tree over points on the globe.
+
+    Points are stored as 3-D unit vectors, where chord length orders pairs
+    exactly like great-circle distance, so there is no special casing for
+    the antimeridian or the poles. Rebuild the index when the points change.
+    """
+
+    def __init__(self, points):
+        """``points`` is an iterable of (key, latitude, longitude)."""
+        self._points = [(key, lat, lon, _unit_vector(lat, lon)) for key, lat, lon in points]
+        self._root = self._build(list(range(len(self._points))), 0)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _build(self, indexes, depth):
+        if not indexes:
+            return None
+        axis = depth % 3
+        indexes.sort(key=lambda i: self._points[i][3][axis])
+        middle = len(indexes) // 2
+        return (
+            indexes[middle],
+            axis,
+            self._build(indexes[:middle], depth + 1),
+            self._build(indexes[middle + 1:], depth + 1),
+        )
+
+    def nearest(self, lat, lon, k=5, radius_km=None):
+        """Return up to ``k`` (key, distance_km) pairs, nearest first."""
+        if k <= 0 or self._root is None:
+            return []
+        target = _unit_vector(lat, lon)
+        limit = _chord_for_km(radius_km) ** 2 if radius_km is not None else math.inf
+        best = []  # max-heap of (-squared chord, index)
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self._points[index][3]
+            squared = sum((a - b) ** 2 for a, b in zip(point, target))
+            if squared <= limit:
+                if len(best) < k:
+                    heapq.heappush(best, (-squared, index))
+                elif squared < -best[0][0]:
+                    heapq.heapreplace(best, (-squared, index))
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            bound = -best[0][0] if len(best) == k else limit
+            if delta * delta <= bound:
+                visit(far)
+
+        visit(self._root)
+        results = []
+        for _, index in sorted(best, key=lambda item: -item[0]):
+            key, point_lat, point_lon, _ = self._points[index]
+            results.append((key, haversine_km(lat, lon, point_lat, point_lon)))
+        return results
+
+
+# Web Mercator stops at about 85.0511 degrees; clamp so polar fixes land in the edge tiles
+MAX_MERCATOR_LATITUDE = 85.05112878
+
+
+def tile_xy(lat, lon, zoom):
+    """Slippy-map tile (x, y) holding a point at ``zoom``."""
+    n = 1 << zoom
+    lat = max(-MAX_MERCATOR_LATITUDE, min(MAX_MERCATOR_LATITUDE, lat))
+    phi = math.radians(lat)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(phi)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
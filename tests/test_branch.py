@@ -0,0 +1,59 @@
+import pytest
+
+from branch import Branch, parse_lat_long, with_coordinates
+
+
+@pytest.mark.parametrize("lat_long, expected", [
+    ("11.5564, 104.9282", (11.5564, 104.9282)),
+    ("11.5564,104.9282", (11.5564, 104.9282)),
+    ("11.5564 104.9282", (11.5564, 104.9282)),
+    ("11.5564; 104.9282", (11.5564, 104.9282)),
+    ("-33.8688, 151.2093", (-33.8688, 151.2093)),
+    ("11, 104", (11.0, 104.0)),
+    ("https://maps.google.com/?q=11.5564,104.9282", (11.5564, 104.9282)),
+    ("90, 180", (90.0, 180.0)),
+])
+def test_parse_lat_long_reads_coordinates(lat_long, expected):
+    assert parse_lat_long(lat_long) == expected
+
+
+@pytest.mark.parametrize("lat_long", [
+    None,
+    "",
+    "   ",
+    "abc",
+    "Phnom Penh",
+    "11.5564",
+    "11.5564,",
+    ", 104.9282",
+    "91, 10",
+    "-90.5, 10",
+    "10, 181",
+    "10, -180.01",
+    "https://maps.app.goo.gl/AbCdEf",
+])
+def test_parse_lat_long_rejects_malformed_input(lat_long):
+    assert parse_lat_long(lat_long) is None
+
+
+def test_with_coordinates_fills_from_lat_long():
+    branch = with_coordinates(Branch(name="Central", lat_long="11.5564, 104.9282"))
+    assert (branch.latitude, branch.longitude) == (11.5564, 104.9282)
+
+
+def test_with_coordinates_leaves_unreadable_lat_long_alone():
+    branch = Branch(name="Central", lat_long="somewhere", latitude=1.0, longitude=2.0)
+    assert with_coordinates(branch) is branch
+    assert with_coordinates(Branch(name="Central", lat_long="91, 10")).latitude is None
+
+
+def test_with_coordinates_replaces_stale_coordinates_when_lat_long_changes():
+    # The client echoed the old coordinates with a new lat_long
+    branch = Branch(name="Central", lat_long="13.3633, 103.8564", latitude=11.5564, longitude=104.9282)
+    branch = with_coordinates(branch, stored_lat_long="11.5564, 104.9282")
+    assert (branch.latitude, branch.longitude) == (13.3633, 103.8564)
+
+
+def test_with_coordinates_keeps_explicit_coordinates_when_lat_long_is_unchanged():
+    branch = Branch(name="Central", lat_long="11.5564, 104.9282", latitude=11.5570, longitude=104.9290)
+    assert with_coordinates(branch, stored_lat_long="11.5564, 104.9282") is branch
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from buffered_writer import BufferedWriter, WriterOverloaded
+
+
+class Sink:
+    """Records each batch; fails the first ``failures`` writes."""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self, batch):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(batch))
+
+
+@pytest.fixture
+def no_retry_backoff(monkeypatch):
+    # Retries back off with asyncio.sleep; this patches the asyncio module itself,
+    # so tests using it must not rely on sleeping
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr("buffered_writer.asyncio.sleep", lambda seconds: real_sleep(0))
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_flushes_when_max_batch_rows_are_waiting():
+    async def scenario():
+        sink = Sink()
+        writer = BufferedWriter("test", sink, max_batch=3, flush_interval=60)
+        writer.start()
+        await writer.submit([1, 2])
+        await asyncio.sleep(0.05)
+        assert sink.batches == []  # below max_batch and the interval is far off
+        await writer.submit([3], durable=True)
+        assert sink.batches == [[1, 2, 3]]
+        await writer.submit([4])
+        await writer.stop()
+        return sink, writer
+
+    sink, writer = run(scenario())
+    assert sink.batches == [[1, 2, 3], [4]]
+    assert writer.written == 4 and writer.flushes == 2
+
+
+def test_flushes_after_the_interval():
+    async def scenario():
+        sink = Sink()
+        writer = BufferedWriter("test", sink, max_batch=100, flush_interval=0.05)
+        writer.start()
+        await writer.submit([1])
+        await asyncio.sleep(0.2)
+        flushed = list(sink.batches)
+        await writer.stop()
+        return flushed
+
+    assert run(scenario()) == [[1]]
+
+
+def test_failed_write_is_retried_with_the_same_batch(no_retry_backoff):
+    async def scenario():
+        sink = Sink(failures=2)
+        writer = BufferedWriter("test", sink, max_batch=10, flush_interval=0.01, max_retries=3)
+        writer.start()
+        await writer.submit([1, 2], durable=True)
+        await writer.stop()
+        return sink, writer
+
+    sink, writer = run(scenario())
+    assert sink.calls == 3
+    assert sink.batches == [[1, 2]]
+    assert writer.failed_flushes == 2 and writer.dropped == 0 and writer.written == 2
+
+
+def test_batch_is_dropped_after_retries_and_durable_callers_see_the_error(no_retry_backoff):
+    async def scenario():
+        sink = Sink(failures=10)
+        writer = BufferedWriter("test", sink, max_batch=10, flush_interval=0.01, max_retries=1)
+        writer.start()
+        with pytest.raises(RuntimeError):
+            await writer.submit([1, 2], durable=True)
+        # The next batch is written normally
+        sink.failures = 0
+        await writer.submit([3], durable=True)
+        await writer.stop()
+        return sink, writer
+
+    sink, writer = run(scenario())
+    assert sink.batches == [[3]]
+    assert writer.dropped == 2 and writer.written == 1
+
+
+def test_full_buffer_rejects_after_enqueue_timeout():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def blocked(batch):
+            await release.wait()
+
+        writer = BufferedWriter("test", blocked, max_batch=2, flush_interval=0.01, max_pending=2,
+                                enqueue_timeout=0.05)
+        writer.start()
+        await writer.submit([1, 2])  # taken by a flush that does not finish
+        await asyncio.sleep(0.02)
+        await writer.submit([3, 4])  # fills the buffer
+        with pytest.raises(WriterOverloaded):
+            await writer.submit([5])
+        release.set()
+        await writer.stop()
+        return writer
+
+    writer = run(scenario())
+    assert writer.rejected == 1 and writer.written == 4
+
+
+def test_waiting_submit_proceeds_once_a_flush_frees_space():
+    async def scenario():
+        release = asyncio.Event()
+        sink = Sink()
+
+        async def gated(batch):
+            await release.wait()
+            await sink(batch)
+
+        writer = BufferedWriter("test", gated, max_batch=2, flush_interval=0.01, max_pending=2,
+                                enqueue_timeout=5)
+        writer.start()
+        await writer.submit([1, 2])
+        await asyncio.sleep(0.02)
+        await writer.submit([3, 4])
+        waiting = asyncio.create_task(writer.submit([5]))
+        await asyncio.sleep(0.02)
+        assert not waiting.done()
+        release.set()
+        await waiting
+        await writer.stop()
+        return sink
+
+    assert run(scenario()).batches == [[1, 2], [3, 4], [5]]
+
+
+def test_writes_straight_through_when_not_started():
+    sink = Sink()
+    writer = BufferedWriter("test", sink)
+    run(writer.submit([1, 2]))
+    assert sink.batches == [[1, 2]]
+    assert writer.written == 2
@@ -0,0 +1,69 @@
+from cache import LRUCache
+
+
+def test_evicts_least_recently_used_first():
+    cache = LRUCache("test", max_entries=3)
+    for key in "abc":
+        cache.set(key, key.encode())
+    assert cache.get("a") == b"a"  # a is now the most recent
+    cache.set("d", b"d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [b"a", b"c", b"d"]
+    assert cache.evictions == 1
+
+
+def test_byte_cap_evicts_oldest_until_it_fits():
+    cache = LRUCache("test", max_entries=10, max_bytes=10)
+    cache.set("a", b"xxxx")
+    cache.set("b", b"xxxx")
+    cache.set("c", b"xxxx")
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 8
+    cache.set("big", b"x" * 11)  # larger than the whole cache: not stored, nothing evicted
+    assert cache.get("big") is None
+    assert cache.get("b") == b"xxxx"
+
+
+def test_replacing_a_key_keeps_byte_count_exact():
+    cache = LRUCache("test")
+    cache.set("a", b"xxxx")
+    cache.set("a", b"xx")
+    assert cache.stats()["bytes"] == 2
+    assert cache.get("a") == b"xx"
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: now[0])
+    cache = LRUCache("test", ttl=5)
+    cache.set("a", b"a")
+    now[0] += 4
+    assert cache.get("a") == b"a"
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_set_with_stale_epoch_is_dropped():
+    cache = LRUCache("test")
+    epoch = cache.epoch  # read-through caller looks at the epoch, then queries
+    cache.invalidate("a")  # a write lands while the query runs
+    cache.set("a", b"old", epoch=epoch)
+    assert cache.get("a") is None
+    cache.set("a", b"new", epoch=cache.epoch)
+    assert cache.get("a") == b"new"
+
+
+def test_invalidate_and_clear_bump_epoch_and_remove_entries():
+    cache = LRUCache("test")
+    cache.set("a", b"a")
+    cache.set("b", b"b")
+    epoch = cache.epoch
+    cache.invalidate("a", "missing")
+    assert cache.epoch == epoch + 1
+    assert cache.get("a") is None and cache.get("b") == b"b"
+    assert cache.invalidations == 1
+    cache.clear()
+    assert cache.epoch == epoch + 2
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 0
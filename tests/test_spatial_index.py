@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from spatial_index import SpatialIndex, haversine_km
+
+
+def brute_force(points, lat, lon, k, radius_km=None):
+    distances = sorted(haversine_km(lat, lon, point_lat, point_lon) for _, point_lat, point_lon in points)
+    if radius_km is not None:
+        distances = [d for d in distances if d <= radius_km]
+    return distances[:k]
+
+
+def assert_matches_brute_force(points, results, lat, lon, k, radius_km=None):
+    expected = brute_force(points, lat, lon, k, radius_km)
+    assert [d for _, d in results] == pytest.approx(expected, abs=1e-6)
+    # Keys must be real and their distances correct; among equidistant points any may be returned
+    by_key = {key: (point_lat, point_lon) for key, point_lat, point_lon in points}
+    assert len({key for key, _ in results}) == len(results)
+    for key, distance in results:
+        assert haversine_km(lat, lon, *by_key[key]) == pytest.approx(distance)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_matches_brute_force(seed):
+    rng = random.Random(seed)
+    points = [(i, rng.uniform(-90, 90), rng.uniform(-180, 180)) for i in range(300)]
+    index = SpatialIndex(points)
+    for _ in range(50):
+        lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        k = rng.choice([1, 5, 20, 500])
+        assert_matches_brute_force(points, index.nearest(lat, lon, k=k), lat, lon, k)
+
+
+def test_nearest_within_radius_matches_brute_force():
+    rng = random.Random(42)
+    # A city-sized cluster, where the radius cuts through the candidates
+    points = [(i, 11.55 + rng.uniform(-0.2, 0.2), 104.92 + rng.uniform(-0.2, 0.2)) for i in range(200)]
+    index = SpatialIndex(points)
+    for radius_km in [0.5, 2, 10, 50]:
+        results = index.nearest(11.56, 104.93, k=50, radius_km=radius_km)
+        assert all(d <= radius_km for _, d in results)
+        assert_matches_brute_force(points, results, 11.56, 104.93, 50, radius_km)
+
+
+def test_ties_are_all_returned_at_the_same_distance():
+    # Four points one degree away along the compass, from a point on the equator
+    points = [("north", 1, 0), ("south", -1, 0), ("east", 0, 1), ("west", 0, -1), ("far", 5, 5)]
+    index = SpatialIndex(points)
+    results = index.nearest(0, 0, k=4)
+    assert {key for key, _ in results} == {"north", "south", "east", "west"}
+    assert_matches_brute_force(points, results, 0, 0, 4)
+    # When the ties straddle k, any two of them are correct
+    results = index.nearest(0, 0, k=2)
+    assert {key for key, _ in results} <= {"north", "south", "east", "west"}
+    assert_matches_brute_force(points, results, 0, 0, 2)
+
+
+def test_duplicate_points_are_kept_separately():
+    index = SpatialIndex([("a", 10, 10), ("b", 10, 10), ("c", 10, 10)])
+    results = index.nearest(10, 10, k=5)
+    assert sorted(key for key, _ in results) == ["a", "b", "c"]
+    assert all(d == pytest.approx(0) for _, d in results)
+
+
+def test_antimeridian_neighbours_are_nearest():
+    index = SpatialIndex([("fiji", -17.7, 179.9), ("samoa", -13.8, -172.1), ("perth", -31.9, 115.9)])
+    assert [key for key, _ in index.nearest(-17.7, -179.9, k=2)] == ["fiji", "samoa"]
+
+
+def test_empty_index_and_non_positive_k():
+    assert len(SpatialIndex([])) == 0
+    assert SpatialIndex([]).nearest(0, 0, k=5) == []
+    index = SpatialIndex([("a", 0, 0)])
+    assert index.nearest(0, 0, k=0) == []
+    assert index.nearest(0, 0, k=-1) == []
+
+
+def test_radius_excluding_everything_returns_nothing():
+    index = SpatialIndex([("a", 0, 0), ("b", 1, 1)])
+    assert index.nearest(45, 45, k=5, radius_km=10) == []